@@ -1,6 +1,5 @@
 """API package for URL Shortener Service."""
 
-from .routes import health_router, urls_router
-
-__all__ = ["health_router", "urls_router"]
+from .routes import health_router, redirect_router, urls_router
 
+__all__ = ["health_router", "redirect_router", "urls_router"]
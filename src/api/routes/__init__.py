@@ -1,7 +1,7 @@
 """API routes package for URL Shortener Service."""
 
 from .health import router as health_router
+from .redirect import router as redirect_router
 from .urls import router as urls_router
 
-__all__ = ["health_router", "urls_router"]
-
+__all__ = ["health_router", "redirect_router", "urls_router"]
@@ -0,0 +1,103 @@
+"""Redirect API route.
+
+The redirect endpoint (GET /{short_code}) lives on the root application,
+outside the ``/api`` sub-application, so the hottest path skips the CORS
+middleware: browsers follow redirects as navigations, not CORS requests.
+"""
+
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Depends
+from fastapi.responses import RedirectResponse
+
+from ...core.cache import URLCache, get_cache
+from ...core.config import settings
+from ...core.database import Database, get_db
+from ...models.url import ErrorResponse
+from ...utils.shortener import (
+    MAX_SHORT_CODE_LENGTH,
+    MIN_SHORT_CODE_LENGTH,
+    seconds_until_expiry,
+)
+
+router = APIRouter(tags=["Redirect"])
+
+_REDIRECT_CACHE_MAX_AGE = settings.redirect_cache_max_age
+
+
+def build_redirect_response(original_url: str, expires_at: Optional[str]) -> RedirectResponse:
+    """Build the redirect response for a short URL.
+
+    With ``redirect_cache_max_age`` set, the redirect is a cacheable 301 so
+    browsers and CDNs can serve repeat visits without reaching the app
+    (those visits are then not counted as clicks). The max-age never
+    outlives the URL's expiration.
+
+    Args:
+        original_url: The original long URL.
+        expires_at: Optional expiration timestamp.
+
+    Returns:
+        Redirect response to original URL.
+    """
+    max_age = _REDIRECT_CACHE_MAX_AGE
+    remaining = seconds_until_expiry(expires_at)
+    if remaining is not None:
+        max_age = min(max_age, int(remaining))
+    if max_age <= 0:
+        return RedirectResponse(url=original_url, status_code=302)
+    return RedirectResponse(
+        url=original_url,
+        status_code=301,
+        headers={"Cache-Control": f"public, max-age={max_age}"},
+    )
+
+
+@router.get(
+    "/{short_code}",
+    response_class=RedirectResponse,
+    status_code=302,
+    responses={
+        301: {"description": "Cacheable redirect (when redirect_cache_max_age is set)"},
+        302: {"description": "Redirect to original URL"},
+        404: {"model": ErrorResponse, "description": "Short URL not found"},
+    },
+    summary="Redirect to original URL",
+    description="Redirect to the original URL associated with the short code.",
+)
+async def redirect_to_url(
+    short_code: str,
+    db: Database = Depends(get_db),
+    cache: URLCache = Depends(get_cache),
+) -> RedirectResponse:
+    """Redirect to the original URL.
+
+    Args:
+        short_code: The short URL code.
+        db: Database instance.
+        cache: URL cache instance.
+
+    Returns:
+        Redirect response to original URL.
+    """
+    # Only bound the length; the parameterized lookup simply misses for
+    # codes with invalid characters, so no format check is needed here
+    if not MIN_SHORT_CODE_LENGTH <= len(short_code) <= MAX_SHORT_CODE_LENGTH:
+        raise HTTPException(status_code=404, detail="Short URL not found")
+
+    # Get URL from cache, falling back to the database
+    target = await cache.get_redirect_target(short_code)
+    if target is None:
+        target = await db.get_redirect_target(short_code)
+
+        if target is None:
+            raise HTTPException(status_code=404, detail="Short URL not found")
+
+        await cache.set_redirect_target(short_code, *target)
+
+    # Record the click; it is written to the database in the background
+    db.increment_clicks(short_code)
+
+    # Return redirect response
+    original_url, expires_at = target
+    return build_redirect_response(original_url, expires_at)
@@ -1,17 +1,19 @@
 """URL shortening API routes.
 
-This module contains all endpoints for URL operations:
+This module contains the management endpoints for URL operations,
+served under the ``/api`` sub-application:
 - Create short URL (POST /shorten)
-- Redirect to original URL (GET /{short_code})
 - Update URL (PUT /{short_code})
 - Delete URL (DELETE /{short_code})
 - Get URL info (GET /{short_code}/info)
 - List all URLs (GET /)
 """
 
+from functools import lru_cache
+
 from fastapi import APIRouter, HTTPException, Depends, Request
-from fastapi.responses import RedirectResponse
 
+from ...core.cache import URLCache, get_cache
 from ...core.database import Database, get_db
 from ...models.url import URLCreate, ErrorResponse
 from ...schemas.url import (
@@ -23,22 +25,31 @@ from ...utils.shortener import (
     generate_short_code,
     validate_short_code,
     normalize_url,
-    create_short_url,
 )
 
 router = APIRouter(prefix="", tags=["URLs"])
 
 
+@lru_cache(maxsize=64)
+def _build_base_url(scheme: str, netloc: str, root_path: str) -> str:
+    """Build the service base URL; cached since it rarely varies per server."""
+    return f"{scheme}://{netloc}{root_path}".rstrip("/")
+
+
 def get_base_url(request: Request) -> str:
     """Get base URL from request.
 
+    Short URLs point at the root application, so the ``/api`` mount path
+    is not part of the base URL.
+
     Args:
         request: FastAPI request object.
 
     Returns:
         Base URL string.
     """
-    return str(request.base_url).rstrip("/")
+    url = request.url
+    return _build_base_url(url.scheme, url.netloc, request.scope.get("app_root_path", ""))
 
 
 @router.post(
@@ -47,7 +58,6 @@ def get_base_url(request: Request) -> str:
     status_code=201,
     responses={
         201: {"description": "Short URL created successfully"},
-        400: {"model": ErrorResponse, "description": "Invalid request"},
         409: {"model": ErrorResponse, "description": "Short code already exists"},
     },
     summary="Create a short URL",
@@ -71,40 +81,33 @@ async def create_short_url_endpoint(
     # Normalize and validate the original URL
     original_url = normalize_url(str(url_data.original_url))
 
-    # Handle custom code or generate new one
-    short_code: str
+    # Handle expiration
+    expires_at = url_data.expires_at.isoformat() if url_data.expires_at else None
+
+    # Create URL in database; a None result means the short code is taken
+    # Custom code format is already enforced by the URLCreate model
     if url_data.custom_code:
-        if not validate_short_code(url_data.custom_code):
-            raise HTTPException(
-                status_code=400,
-                detail="Custom code must be 3-20 alphanumeric characters",
-            )
-        if db.url_exists(url_data.custom_code):
+        short_code = url_data.custom_code
+        url_record = await db.try_create_url(original_url, short_code, expires_at)
+        if url_record is None:
             raise HTTPException(
                 status_code=409, detail="Short code already exists"
             )
-        short_code = url_data.custom_code
     else:
         # Generate unique short code
         max_attempts = 10
         for _ in range(max_attempts):
             short_code = generate_short_code()
-            if not db.url_exists(short_code):
+            url_record = await db.try_create_url(original_url, short_code, expires_at)
+            if url_record is not None:
                 break
         else:
             raise HTTPException(
                 status_code=500, detail="Failed to generate unique short code"
             )
 
-    # Handle expiration
-    expires_at = url_data.expires_at.isoformat() if url_data.expires_at else None
-
-    # Create URL in database
-    url_record = db.create_url(original_url, short_code, expires_at)
-
     # Build response
-    base_url = get_base_url(request)
-    short_url = create_short_url(base_url, short_code)
+    short_url = f"{get_base_url(request)}/{short_code}"
 
     return URLCreateResponse(
         original_url=original_url,
@@ -115,49 +118,6 @@ async def create_short_url_endpoint(
     )
 
 
-@router.get(
-    "/{short_code}",
-    response_class=RedirectResponse,
-    status_code=302,
-    responses={
-        302: {"description": "Redirect to original URL"},
-        404: {"model": ErrorResponse, "description": "Short URL not found"},
-    },
-    summary="Redirect to original URL",
-    description="Redirect to the original URL associated with the short code.",
-)
-async def redirect_to_url(
-    short_code: str,
-    db: Database = Depends(get_db),
-) -> RedirectResponse:
-    """Redirect to the original URL.
-
-    Args:
-        short_code: The short URL code.
-        db: Database instance.
-
-    Returns:
-        Redirect response to original URL.
-    """
-    # Validate short code format
-    if not validate_short_code(short_code):
-        raise HTTPException(status_code=404, detail="Short URL not found")
-
-    # Get URL from database
-    url_record = db.get_url_by_code(short_code)
-
-    if not url_record:
-        raise HTTPException(status_code=404, detail="Short URL not found")
-
-    # Increment click count
-    db.increment_clicks(short_code)
-
-    # Return redirect response
-    return RedirectResponse(
-        url=url_record["original_url"], status_code=302
-    )
-
-
 @router.delete(
     "/{short_code}",
     response_model=URLDeleteResponse,
@@ -171,12 +131,14 @@ async def redirect_to_url(
 async def delete_short_url(
     short_code: str,
     db: Database = Depends(get_db),
+    cache: URLCache = Depends(get_cache),
 ) -> dict:
     """Delete a short URL.
 
     Args:
         short_code: The short URL code.
         db: Database instance.
+        cache: URL cache instance.
 
     Returns:
         Deletion confirmation.
@@ -186,11 +148,13 @@ async def delete_short_url(
         raise HTTPException(status_code=404, detail="Short URL not found")
 
     # Delete URL from database
-    deleted = db.delete_url(short_code)
+    deleted = await db.delete_url(short_code)
 
     if not deleted:
         raise HTTPException(status_code=404, detail="Short URL not found")
 
+    await cache.invalidate(short_code)
+
     return {
         "message": "URL deleted successfully",
         "short_code": short_code,
@@ -213,6 +177,7 @@ async def update_short_url(
     request: Request,
     url_data: URLCreate,
     db: Database = Depends(get_db),
+    cache: URLCache = Depends(get_cache),
 ) -> dict:
     """Update a short URL.
 
@@ -221,6 +186,7 @@ async def update_short_url(
         request: FastAPI request object.
         url_data: URL update data.
         db: Database instance.
+        cache: URL cache instance.
 
     Returns:
         Updated URL information.
@@ -229,20 +195,17 @@ async def update_short_url(
     if not validate_short_code(short_code):
         raise HTTPException(status_code=404, detail="Short URL not found")
 
-    # Check if URL exists
-    existing_url = db.get_url_by_code(short_code)
-    if not existing_url:
-        raise HTTPException(status_code=404, detail="Short URL not found")
-
     # Normalize the new URL
     original_url = normalize_url(str(url_data.original_url))
 
-    # Update URL in database
-    url_record = db.update_url(short_code, original_url)
+    # Update URL in database; a missing or deleted code matches no row
+    url_record = await db.update_url(short_code, original_url)
+    if url_record is None:
+        raise HTTPException(status_code=404, detail="Short URL not found")
+    await cache.invalidate(short_code)
 
     # Build response
-    base_url = get_base_url(request)
-    short_url = create_short_url(base_url, short_code)
+    short_url = f"{get_base_url(request)}/{short_code}"
 
     return {
         "original_url": original_url,
@@ -250,7 +213,7 @@ async def update_short_url(
         "short_url": short_url,
         "created_at": url_record["created_at"],
         "expires_at": url_record["expires_at"],
-        "clicks": url_record["clicks"],
+        "clicks": url_record["clicks"] + db.pending_clicks(short_code),
         "is_active": url_record["is_active"],
     }
 
@@ -285,14 +248,13 @@ async def get_url_info(
         raise HTTPException(status_code=404, detail="Short URL not found")
 
     # Get URL from database
-    url_record = db.get_url_by_code(short_code)
+    url_record = await db.get_url_by_code(short_code)
 
     if not url_record:
         raise HTTPException(status_code=404, detail="Short URL not found")
 
     # Build response
-    base_url = get_base_url(request)
-    short_url = create_short_url(base_url, short_code)
+    short_url = f"{get_base_url(request)}/{short_code}"
 
     return {
         "original_url": url_record["original_url"],
@@ -300,7 +262,7 @@ async def get_url_info(
         "short_url": short_url,
         "created_at": url_record["created_at"],
         "expires_at": url_record["expires_at"],
-        "clicks": url_record["clicks"],
+        "clicks": url_record["clicks"] + db.pending_clicks(short_code),
         "is_active": bool(url_record["is_active"]),
     }
 
@@ -324,25 +286,5 @@ async def list_urls(
     Returns:
         List of URL information.
     """
-    # Get all URLs from database
-    urls = db.get_all_urls()
-
-    # Build response
-    base_url = get_base_url(request)
-    result = []
-    for url in urls:
-        short_url = create_short_url(base_url, url["short_code"])
-        result.append(
-            {
-                "original_url": url["original_url"],
-                "short_code": url["short_code"],
-                "short_url": short_url,
-                "created_at": url["created_at"],
-                "expires_at": url["expires_at"],
-                "clicks": url["clicks"],
-                "is_active": bool(url["is_active"]),
-            }
-        )
-
-    return result
-
+    # Get all URLs from database, with short URLs built by the query
+    return await db.get_all_urls(get_base_url(request))
@@ -2,6 +2,7 @@
 
 from .config import settings, get_settings
 from .database import Database, db, get_db, get_test_db
+from .cache import URLCache, cache, get_cache
 
 __all__ = [
     "settings",
@@ -10,5 +11,8 @@ __all__ = [
     "db",
     "get_db",
     "get_test_db",
+    "URLCache",
+    "cache",
+    "get_cache",
 ]
 
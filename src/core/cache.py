@@ -0,0 +1,140 @@
+"""Redis cache module for URL Shortener Service.
+
+This module caches short code -> (original URL, expiration) lookups for
+the redirect path. Caching is optional: it is only enabled when ``redis_url`` is
+configured, and Redis errors fall back to the database.
+"""
+
+import logging
+from typing import Optional
+
+from .config import settings
+from ..utils.shortener import seconds_until_expiry
+
+try:
+    import redis.asyncio as redis
+except ImportError:  # pragma: no cover - redis is an optional dependency
+    redis = None
+
+logger = logging.getLogger(__name__)
+
+
+class URLCache:
+    """Cache of redirect targets keyed by short code.
+
+    Values are stored as ``expires_at`` and ``original_url`` joined by a
+    newline, which normalized URLs never contain; ``expires_at`` is empty
+    when unset.
+    """
+
+    key_prefix = "u:"
+
+    def __init__(self, redis_url: Optional[str] = None, default_ttl: Optional[int] = None):
+        """Initialize the cache.
+
+        Args:
+            redis_url: Redis connection URL. Caching is disabled if not set.
+            default_ttl: TTL in seconds for URLs without an expiration.
+        """
+        self.redis_url = redis_url
+        self.default_ttl = default_ttl or settings.cache_ttl
+        self._client: Optional["redis.Redis"] = None
+
+    @property
+    def enabled(self) -> bool:
+        """Whether the cache is connected to Redis."""
+        return self._client is not None
+
+    def _key(self, short_code: str) -> str:
+        """Build the Redis key for a short code."""
+        return f"{self.key_prefix}{short_code}"
+
+    async def connect(self) -> None:
+        """Create the Redis client if a Redis URL is configured."""
+        if not self.redis_url or self._client is not None:
+            return
+        if redis is None:
+            raise RuntimeError("redis_url is set but the 'redis' package is not installed")
+        self._client = redis.Redis.from_url(self.redis_url, decode_responses=True)
+        logger.info("URL cache enabled")
+
+    async def close(self) -> None:
+        """Close the Redis client."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def get_redirect_target(
+        self, short_code: str
+    ) -> Optional[tuple[str, Optional[str]]]:
+        """Get the cached redirect target for a short code.
+
+        Args:
+            short_code: The short URL code.
+
+        Returns:
+            Tuple of ``(original_url, expires_at)`` or None on a cache miss.
+        """
+        if self._client is None:
+            return None
+        try:
+            value = await self._client.get(self._key(short_code))
+        except redis.RedisError as e:
+            logger.warning(f"Cache lookup failed: {e}")
+            return None
+        if value is None:
+            return None
+        expires_at, _, original_url = value.partition("\n")
+        return original_url, expires_at or None
+
+    async def set_redirect_target(
+        self, short_code: str, original_url: str, expires_at: Optional[str] = None
+    ) -> None:
+        """Cache the redirect target for a short code.
+
+        The TTL never outlives the URL's expiration; expired URLs are not cached.
+
+        Args:
+            short_code: The short URL code.
+            original_url: The original long URL.
+            expires_at: Optional expiration timestamp.
+        """
+        if self._client is None:
+            return
+        ttl = self.default_ttl
+        remaining = seconds_until_expiry(expires_at)
+        if remaining is not None:
+            ttl = min(ttl, int(remaining))
+        if ttl <= 0:
+            return
+        try:
+            value = f"{expires_at or ''}\n{original_url}"
+            await self._client.setex(self._key(short_code), ttl, value)
+        except redis.RedisError as e:
+            logger.warning(f"Cache store failed: {e}")
+
+    async def invalidate(self, short_code: str) -> None:
+        """Remove a short code from the cache.
+
+        Args:
+            short_code: The short URL code.
+        """
+        if self._client is None:
+            return
+        try:
+            await self._client.delete(self._key(short_code))
+        except redis.RedisError as e:
+            logger.warning(f"Cache invalidation failed: {e}")
+
+
+# Global cache instance, connected in the application lifespan
+cache = URLCache(settings.redis_url)
+
+
+async def get_cache() -> URLCache:
+    """Get cache instance for dependency injection.
+
+    Returns:
+        Shared URLCache instance.
+    """
+    return cache
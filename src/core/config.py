@@ -2,6 +2,7 @@
 
 from pathlib import Path
 from functools import lru_cache
+from typing import Optional
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -16,12 +17,24 @@ class Settings(BaseSettings):
 
     # Database
     database_url: str = "url_shortener.db"
+    click_flush_interval: float = 1.0
+
+    # Seconds browsers/CDNs may cache redirects (issued as 301); 0 keeps
+    # uncached 302s so every visit is counted as a click
+    redirect_cache_max_age: int = 0
+
+    # Cache (disabled unless redis_url is set)
+    redis_url: Optional[str] = None
+    cache_ttl: int = 3600
 
     # Application
     app_title: str = "URL Shortener Service"
     app_version: str = "0.1.0"
     app_description: str = "A simple and lightweight URL shortening service"
 
+    # CORS origins allowed to call the /api management endpoints
+    cors_origins: list[str] = ["http://localhost:3000"]
+
     # URL Shortener
     default_short_code_length: int = 6
     max_short_code_length: int = 20
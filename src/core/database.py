@@ -2,16 +2,74 @@
 
 This module handles SQLite database operations and provides
 dependency injection for FastAPI endpoints.
+
+All I/O goes through aiosqlite, so queries run on a dedicated worker
+thread instead of blocking the event loop.
 """
 
+import asyncio
 import sqlite3
 import logging
+from collections import Counter
+from contextlib import suppress
 from typing import Optional
 
+import aiosqlite
+
 from .config import settings
 
 logger = logging.getLogger(__name__)
 
+# Applied to every new connection. synchronous=NORMAL is durable in WAL
+# mode except for the last commits on power loss; mmap and a 64 MiB page
+# cache keep hot pages out of read() syscalls.
+_CONNECTION_PRAGMAS = """
+PRAGMA foreign_keys = ON;
+PRAGMA journal_mode = WAL;
+PRAGMA synchronous = NORMAL;
+PRAGMA temp_store = MEMORY;
+PRAGMA mmap_size = 268435456;
+PRAGMA cache_size = -65536;
+"""
+
+# sqlite3 defaults to caching 128 compiled statements per connection;
+# 256 leaves room for the canonical queries below plus ad-hoc ones.
+_STATEMENT_CACHE_SIZE = 256
+
+# Columns the API actually returns; ``id`` is internal and never exposed.
+_COLS = "original_url, short_code, created_at, expires_at, clicks, is_active"
+
+# Canonical queries. Keeping them as module constants means every call
+# passes the same SQL text, so sqlite3's per-connection statement cache
+# serves the compiled statement instead of re-parsing it.
+_Q_GET_BY_CODE = f"SELECT {_COLS} FROM urls WHERE short_code = ? AND is_active = 1"
+_Q_GET_REDIRECT = "SELECT original_url, expires_at FROM urls WHERE short_code = ? AND is_active = 1"
+_Q_GET_BY_ID = f"SELECT {_COLS} FROM urls WHERE id = ?"
+_Q_CREATE = f"""
+INSERT INTO urls (original_url, short_code, expires_at)
+VALUES (?, ?, ?)
+RETURNING {_COLS}
+"""
+_Q_CREATE_BULK = "INSERT INTO urls (original_url, short_code) VALUES (?, ?)"
+_Q_TRY_CREATE = f"""
+INSERT OR IGNORE INTO urls (original_url, short_code, expires_at)
+VALUES (?, ?, ?)
+RETURNING {_COLS}
+"""
+_Q_UPDATE = f"""
+UPDATE urls SET original_url = ?
+WHERE short_code = ? AND is_active = 1
+RETURNING {_COLS}
+"""
+_Q_DELETE = "UPDATE urls SET is_active = 0 WHERE short_code = ?"
+_Q_ADD_CLICKS = "UPDATE urls SET clicks = clicks + ? WHERE short_code = ?"
+_Q_GET_ALL = """
+SELECT original_url, short_code, (? || '/' || short_code) AS short_url,
+       created_at, expires_at, clicks, is_active
+FROM urls WHERE is_active = 1 ORDER BY created_at DESC
+"""
+_Q_EXISTS = "SELECT 1 FROM urls WHERE short_code = ?"
+
 
 class Database:
     """Database class for managing SQLite connections and operations."""
@@ -26,37 +84,49 @@ class Database:
             self.db_path = db_path
         else:
             self.db_path = settings.database_url
-        self._connection: Optional[sqlite3.Connection] = None
+        self._connection: Optional[aiosqlite.Connection] = None
+        self._click_buffer: Counter[str] = Counter()
+        # Serializes writes on the shared autocommit connection, so a
+        # statement never runs inside another caller's explicit transaction
+        self._write_lock = asyncio.Lock()
 
-    def _get_connection(self) -> sqlite3.Connection:
-        """Create or return the database connection.
+    async def connect(self) -> aiosqlite.Connection:
+        """Open the database connection if it is not open yet.
 
-        For in-memory databases (":memory:"), allows access from multiple threads.
-        For file-based databases, creates new connections per operation.
+        The connection runs in autocommit mode (``isolation_level=None``),
+        so single statements do not need an explicit commit. WAL journaling
+        lets redirects keep reading while a write is in progress.
 
         Returns:
-            SQLite connection.
+            aiosqlite connection.
         """
         if self._connection is None:
-            # For in-memory databases, allow access from multiple threads
-            if self.db_path == ":memory:":
-                self._connection = sqlite3.connect(
-                    self.db_path,
-                    check_same_thread=False
-                )
-            else:
-                self._connection = sqlite3.connect(self.db_path)
+            self._connection = await aiosqlite.connect(
+                self.db_path,
+                isolation_level=None,
+                cached_statements=_STATEMENT_CACHE_SIZE,
+            )
             self._connection.row_factory = sqlite3.Row
-            self._connection.execute("PRAGMA foreign_keys = ON")
+            await self._connection.executescript(_CONNECTION_PRAGMAS)
+        return self._connection
+
+    async def _get_connection(self) -> aiosqlite.Connection:
+        """Return the open database connection, connecting on first use.
+
+        Returns:
+            aiosqlite connection.
+        """
+        if self._connection is None:
+            return await self.connect()
         return self._connection
 
-    def close(self) -> None:
+    async def close(self) -> None:
         """Close database connection."""
         if self._connection is not None:
-            self._connection.close()
+            await self._connection.close()
             self._connection = None
 
-    def init_db(self) -> None:
+    async def init_db(self) -> None:
         """Initialize database tables."""
         create_table_sql = """
         CREATE TABLE IF NOT EXISTS urls (
@@ -69,24 +139,26 @@ class Database:
             is_active INTEGER DEFAULT 1
         )
         """
+        # short_code lookups use the UNIQUE constraint's index; the partial
+        # index serves get_all_urls in order without a sort or inactive rows.
         create_index_sql = """
-        CREATE INDEX IF NOT EXISTS idx_short_code ON urls(short_code);
-        CREATE INDEX IF NOT EXISTS idx_created_at ON urls(created_at);
+        DROP INDEX IF EXISTS idx_short_code;
+        DROP INDEX IF EXISTS idx_created_at;
+        CREATE INDEX IF NOT EXISTS idx_active_created
+            ON urls(created_at DESC) WHERE is_active = 1;
         """
-        conn = self._get_connection()
+        conn = await self._get_connection()
         try:
-            cursor = conn.cursor()
-            cursor.execute(create_table_sql)
-            cursor.executescript(create_index_sql)
-            conn.commit()
+            await conn.execute(create_table_sql)
+            await conn.executescript(create_index_sql)
             logger.info("Database initialized successfully")
         except sqlite3.Error as e:
             logger.error(f"Database initialization failed: {e}")
             raise
 
-    def execute(
+    async def execute(
         self, query: str, params: tuple = (), fetch: bool = False
-    ) -> Optional[list[sqlite3.Row]]:
+    ) -> Optional[list[dict]]:
         """Execute a SQL query.
 
         Args:
@@ -97,20 +169,18 @@ class Database:
         Returns:
             Query results if fetch=True, None otherwise.
         """
-        conn = self._get_connection()
+        conn = await self._get_connection()
         try:
-            cursor = conn.cursor()
-            cursor.execute(query, params)
             if fetch:
-                results = cursor.fetchall()
+                results = await conn.execute_fetchall(query, params)
                 return [dict(row) for row in results]
-            conn.commit()
+            await conn.execute(query, params)
             return None
         except sqlite3.Error as e:
             logger.error(f"Query execution failed: {e}")
             raise
 
-    def get_url_by_code(self, short_code: str) -> Optional[dict]:
+    async def get_url_by_code(self, short_code: str) -> Optional[sqlite3.Row]:
         """Get URL record by short code.
 
         Args:
@@ -119,11 +189,24 @@ class Database:
         Returns:
             URL record or None if not found.
         """
-        query = "SELECT * FROM urls WHERE short_code = ? AND is_active = 1"
-        results = self.execute(query, (short_code,), fetch=True)
-        return results[0] if results else None
+        conn = await self._get_connection()
+        rows = await conn.execute_fetchall(_Q_GET_BY_CODE, (short_code,))
+        return rows[0] if rows else None
 
-    def get_url_by_id(self, url_id: int) -> Optional[dict]:
+    async def get_redirect_target(self, short_code: str) -> Optional[sqlite3.Row]:
+        """Get only what the redirect endpoint needs for a short code.
+
+        Args:
+            short_code: The short URL code.
+
+        Returns:
+            Row of ``(original_url, expires_at)`` or None if not found.
+        """
+        conn = await self._get_connection()
+        async with conn.execute(_Q_GET_REDIRECT, (short_code,)) as cursor:
+            return await cursor.fetchone()
+
+    async def get_url_by_id(self, url_id: int) -> Optional[sqlite3.Row]:
         """Get URL record by ID.
 
         Args:
@@ -132,13 +215,13 @@ class Database:
         Returns:
             URL record or None if not found.
         """
-        query = "SELECT * FROM urls WHERE id = ?"
-        results = self.execute(query, (url_id,), fetch=True)
-        return results[0] if results else None
+        conn = await self._get_connection()
+        rows = await conn.execute_fetchall(_Q_GET_BY_ID, (url_id,))
+        return rows[0] if rows else None
 
-    def create_url(
+    async def create_url(
         self, original_url: str, short_code: str, expires_at: Optional[str] = None
-    ) -> dict:
+    ) -> sqlite3.Row:
         """Create a new shortened URL.
 
         Args:
@@ -149,17 +232,62 @@ class Database:
         Returns:
             Created URL record.
         """
-        query = """
-        INSERT INTO urls (original_url, short_code, expires_at)
-        VALUES (?, ?, ?)
+        conn = await self._get_connection()
+        async with self._write_lock:
+            rows = await conn.execute_fetchall(
+                _Q_CREATE, (original_url, short_code, expires_at)
+            )
+        logger.info(f"Created short URL: {short_code}")
+        return rows[0]
+
+    async def create_urls_bulk(self, urls: list[tuple[str, str]]) -> None:
+        """Create several shortened URLs in a single transaction.
+
+        Args:
+            urls: ``(original_url, short_code)`` pairs.
+        """
+        conn = await self._get_connection()
+        async with self._write_lock:
+            try:
+                await conn.execute("BEGIN")
+                await conn.executemany(_Q_CREATE_BULK, urls)
+                await conn.execute("COMMIT")
+            except BaseException as e:
+                logger.error(f"Bulk create failed: {e!r}")
+                with suppress(sqlite3.OperationalError):
+                    await conn.execute("ROLLBACK")
+                raise
+        logger.info(f"Created {len(urls)} short URLs")
+
+    async def try_create_url(
+        self, original_url: str, short_code: str, expires_at: Optional[str] = None
+    ) -> Optional[sqlite3.Row]:
+        """Create a new shortened URL unless the short code is already taken.
+
+        Relies on the UNIQUE constraint on ``short_code``, so the existence
+        check and the insert happen atomically in one statement.
+
+        Args:
+            original_url: The original long URL.
+            short_code: The short URL code.
+            expires_at: Optional expiration timestamp.
+
+        Returns:
+            Created URL record or None if the short code already exists.
         """
-        self.execute(query, (original_url, short_code, expires_at))
+        conn = await self._get_connection()
+        async with self._write_lock:
+            rows = await conn.execute_fetchall(
+                _Q_TRY_CREATE, (original_url, short_code, expires_at)
+            )
+        if not rows:
+            return None
         logger.info(f"Created short URL: {short_code}")
-        return self.get_url_by_code(short_code)
+        return rows[0]
 
-    def update_url(
+    async def update_url(
         self, short_code: str, new_original_url: str
-    ) -> Optional[dict]:
+    ) -> Optional[sqlite3.Row]:
         """Update original URL for a short code.
 
         Args:
@@ -169,12 +297,17 @@ class Database:
         Returns:
             Updated URL record or None if not found.
         """
-        query = "UPDATE urls SET original_url = ? WHERE short_code = ?"
-        self.execute(query, (new_original_url, short_code))
+        conn = await self._get_connection()
+        async with self._write_lock:
+            rows = await conn.execute_fetchall(
+                _Q_UPDATE, (new_original_url, short_code)
+            )
+        if not rows:
+            return None
         logger.info(f"Updated URL: {short_code}")
-        return self.get_url_by_code(short_code)
+        return rows[0]
 
-    def delete_url(self, short_code: str) -> bool:
+    async def delete_url(self, short_code: str) -> bool:
         """Soft delete a URL (mark as inactive).
 
         Args:
@@ -183,39 +316,112 @@ class Database:
         Returns:
             True if deleted, False if not found.
         """
-        conn = self._get_connection()
+        conn = await self._get_connection()
         try:
-            query = "UPDATE urls SET is_active = 0 WHERE short_code = ?"
-            cursor = conn.cursor()
-            cursor.execute(query, (short_code,))
-            conn.commit()
-            deleted = cursor.rowcount > 0
+            async with self._write_lock:
+                async with conn.execute(_Q_DELETE, (short_code,)) as cursor:
+                    deleted = cursor.rowcount > 0
             if deleted:
                 logger.info(f"Deleted short URL: {short_code}")
-            return deleted > 0
+            return deleted
         except sqlite3.Error as e:
             logger.error(f"Delete failed: {e}")
             raise
 
     def increment_clicks(self, short_code: str) -> None:
-        """Increment click count for a URL.
+        """Record a click for a URL.
+
+        Clicks are buffered in memory and written to the database by
+        ``flush_clicks``.
 
         Args:
             short_code: The short URL code.
         """
-        query = "UPDATE urls SET clicks = clicks + 1 WHERE short_code = ?"
-        self.execute(query, (short_code,))
+        self._click_buffer[short_code] += 1
+
+    def pending_clicks(self, short_code: str) -> int:
+        """Get the number of buffered clicks not yet written to the database.
+
+        Args:
+            short_code: The short URL code.
+
+        Returns:
+            Number of pending clicks.
+        """
+        return self._click_buffer[short_code]
+
+    async def flush_clicks(self) -> int:
+        """Write buffered click counts to the database in one transaction.
 
-    def get_all_urls(self) -> list[dict]:
-        """Get all active URLs.
+        ``BEGIN IMMEDIATE`` takes the write lock once for the whole batch;
+        with WAL enabled, readers are not blocked while it is held. On any
+        failure, including cancellation, an open transaction is rolled back
+        and the clicks go back into the buffer. A COMMIT that was already
+        sent when cancellation arrived still completes on the worker thread,
+        so in that case the batch counts as written.
 
         Returns:
-            List of URL records.
+            Number of URLs whose click count was updated.
         """
-        query = "SELECT * FROM urls WHERE is_active = 1 ORDER BY created_at DESC"
-        return self.execute(query, fetch=True) or []
+        conn = await self._get_connection()
+        async with self._write_lock:
+            pending, self._click_buffer = self._click_buffer, Counter()
+            if not pending:
+                return 0
+            commit_sent = False
+            try:
+                await conn.execute("BEGIN IMMEDIATE")
+                await conn.executemany(
+                    _Q_ADD_CLICKS, [(count, code) for code, count in pending.items()]
+                )
+                commit_sent = True
+                await conn.execute("COMMIT")
+            except BaseException as e:
+                logger.error(f"Click flush failed: {e!r}")
+                # Queued behind any statement still running on the worker
+                # thread, so it only fails once no transaction is open
+                rolled_back = True
+                try:
+                    await conn.execute("ROLLBACK")
+                except sqlite3.OperationalError:
+                    rolled_back = False
+                # Without an open transaction, a COMMIT that was interrupted
+                # by cancellation has gone through; anything else did not
+                committed = (
+                    commit_sent
+                    and not rolled_back
+                    and not isinstance(e, sqlite3.Error)
+                )
+                if not committed:
+                    # Keep the clicks so the next flush can retry them
+                    self._click_buffer.update(pending)
+                raise
+            return len(pending)
+
+    async def get_all_urls(self, base_url: str) -> list[dict]:
+        """Get all active URLs, ready to be returned by the API.
+
+        The short URL is built inside SQLite, so rows only need to be
+        turned into dicts for the response model. Buffered clicks that have
+        not been flushed yet are added while copying.
 
-    def url_exists(self, short_code: str) -> bool:
+        Args:
+            base_url: Base URL of the service, without a trailing slash.
+
+        Returns:
+            List of URL records including ``short_url``.
+        """
+        conn = await self._get_connection()
+        rows = await conn.execute_fetchall(_Q_GET_ALL, (base_url,))
+        pending = self._click_buffer
+        urls = []
+        for row in rows:
+            url = dict(row)
+            url["clicks"] += pending.get(url["short_code"], 0)
+            urls.append(url)
+        return urls
+
+    async def url_exists(self, short_code: str) -> bool:
         """Check if a short code already exists.
 
         Args:
@@ -224,31 +430,56 @@ class Database:
         Returns:
             True if exists, False otherwise.
         """
-        query = "SELECT 1 FROM urls WHERE short_code = ?"
-        results = self.execute(query, (short_code,), fetch=True)
-        return len(results) > 0 if results else False
+        conn = await self._get_connection()
+        rows = await conn.execute_fetchall(_Q_EXISTS, (short_code,))
+        return len(rows) > 0
 
 
-# Global database instance
+async def flush_clicks_periodically(
+    database: Database, interval: float, stop: asyncio.Event
+) -> None:
+    """Flush buffered click counts every ``interval`` seconds until stopped.
+
+    The loop only checks ``stop`` between flushes, so setting it never
+    interrupts a flush halfway through.
+
+    Args:
+        database: Database whose click buffer should be flushed.
+        interval: Seconds to wait between flushes.
+        stop: Event that ends the loop once set.
+    """
+    while True:
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=interval)
+            return
+        except asyncio.TimeoutError:
+            pass
+        try:
+            await database.flush_clicks()
+        except sqlite3.Error:
+            # Already logged; the clicks stay buffered for the next run
+            pass
+
+
+# Global database instance, connected in the application lifespan
 db = Database()
 
 
-def get_db() -> Database:
+async def get_db() -> Database:
     """Get database instance for dependency injection.
 
     Returns:
-        Database instance.
+        Shared Database instance opened by the application lifespan.
     """
     return db
 
 
-def get_test_db() -> Database:
+async def get_test_db() -> Database:
     """Get a fresh in-memory database for testing.
 
     Returns:
         In-memory Database instance.
     """
     test_db = Database(":memory:")
-    test_db.init_db()
+    await test_db.init_db()
     return test_db
-
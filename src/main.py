@@ -6,18 +6,26 @@ A simple and lightweight URL shortening service with:
 - Delete URLs
 - Update URLs
 - Custom short codes
+
+Production launch (one worker per CPU, uvloop event loop, httptools parser)::
+
+    uvicorn src.main:app --workers $(nproc) --loop uvloop --http httptools \\
+        --limit-concurrency 1000 --timeout-keep-alive 30
 """
 
+import asyncio
 import logging
 from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, Request
 from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
 
 from .core.config import settings
-from .core.database import get_db
-from .api.routes import health_router, urls_router
+from .core.cache import cache
+from .core.database import db, flush_clicks_periodically
+from .api.routes import health_router, redirect_router, urls_router
 
 # Configure logging
 logging.basicConfig(
@@ -32,16 +40,29 @@ async def lifespan(app: FastAPI):
     """Application lifespan handler for startup and shutdown events."""
     # Startup
     logger.info(f"Starting {settings.app_title}...")
-    db = get_db()
-    db.init_db()
+    await db.connect()
+    await db.init_db()
     logger.info("Database initialized")
+    await cache.connect()
+    stop_flushing = asyncio.Event()
+    flush_task = asyncio.create_task(
+        flush_clicks_periodically(db, settings.click_flush_interval, stop_flushing)
+    )
     yield
-    # Shutdown
+    # Shutdown: let an in-progress flush finish, then write what is left
     logger.info("Shutting down URL Shortener Service...")
-    db.close()
+    stop_flushing.set()
+    try:
+        await flush_task
+        await db.flush_clicks()
+    finally:
+        await db.close()
+        await cache.close()
 
 
-# Create FastAPI application
+# Create FastAPI application. JSON routes declare a response_model, so FastAPI
+# serializes them straight to bytes with pydantic-core; a custom
+# default_response_class (e.g. ORJSONResponse) would disable that fast path.
 app = FastAPI(
     title=settings.app_title,
     description=settings.app_description,
@@ -49,17 +70,30 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
+# Management API, mounted under /api. Only this sub-application carries the
+# CORS middleware, so redirects on the root app skip it entirely.
+api_app = FastAPI(
+    title=f"{settings.app_title} API",
+    description=settings.app_description,
+    version=settings.app_version,
+)
+# Share overrides so app.dependency_overrides also applies to /api routes
+api_app.dependency_overrides = app.dependency_overrides
+
+# Compress larger responses such as the URL list; redirects and health
+# checks stay below minimum_size and are sent as-is
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
 # Add CORS middleware
-app.add_middleware(
+api_app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
+    allow_origins=settings.cors_origins,
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST", "PUT", "DELETE"],
+    allow_headers=["Content-Type"],
 )
 
 
-@app.exception_handler(Exception)
 async def general_exception_handler(request: Request, exc: Exception):
     """General exception handler."""
     logger.error(f"Unhandled Exception: {exc}")
@@ -69,7 +103,12 @@ async def general_exception_handler(request: Request, exc: Exception):
     )
 
 
+app.add_exception_handler(Exception, general_exception_handler)
+api_app.add_exception_handler(Exception, general_exception_handler)
+
 # Include routers
+api_app.include_router(urls_router)
 app.include_router(health_router)
-app.include_router(urls_router)
+app.mount("/api", api_app)
+app.include_router(redirect_router)
 
@@ -10,7 +10,11 @@ class URLCreate(BaseModel):
 
     original_url: HttpUrl = Field(..., description="The original long URL to shorten")
     custom_code: Optional[str] = Field(
-        None, min_length=3, max_length=20, description="Custom short code"
+        None,
+        min_length=3,
+        max_length=20,
+        pattern=r"^[A-Za-z0-9]+$",
+        description="Custom short code",
     )
     expires_at: Optional[datetime] = Field(
         None, description="Expiration timestamp"
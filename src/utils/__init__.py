@@ -1,20 +1,28 @@
 """Utils package for URL Shortener Service."""
 
 from .shortener import (
+    MIN_SHORT_CODE_LENGTH,
+    MAX_SHORT_CODE_LENGTH,
     generate_short_code,
+    generate_short_codes,
     validate_short_code,
     normalize_url,
     create_short_url,
     extract_original_url,
     is_url_expired,
+    seconds_until_expiry,
 )
 
 __all__ = [
+    "MIN_SHORT_CODE_LENGTH",
+    "MAX_SHORT_CODE_LENGTH",
     "generate_short_code",
+    "generate_short_codes",
     "validate_short_code",
     "normalize_url",
     "create_short_url",
     "extract_original_url",
     "is_url_expired",
+    "seconds_until_expiry",
 ]
 
@@ -3,9 +3,8 @@
 This module handles the generation and validation of short codes.
 """
 
-import random
 import string
-import re
+from os import urandom
 from typing import Optional
 import logging
 
@@ -17,6 +16,16 @@ logger = logging.getLogger(__name__)
 # Characters allowed in short codes
 ALPHABET = string.ascii_letters + string.digits
 
+# Maps every byte value onto ALPHABET so random bytes become a code with a
+# single bytes.translate call. 256 is not a multiple of 62, so the first
+# 8 characters are slightly more likely; fine for non-secret short codes.
+_BYTE_TO_CHAR = bytes(ord(ALPHABET[i % len(ALPHABET)]) for i in range(256))
+
+# Short code lengths, read once from settings
+_DEFAULT_LENGTH = settings.default_short_code_length
+MIN_SHORT_CODE_LENGTH = settings.min_short_code_length
+MAX_SHORT_CODE_LENGTH = settings.max_short_code_length
+
 
 def generate_short_code(length: Optional[int] = None) -> str:
     """Generate a random short code.
@@ -27,8 +36,23 @@ def generate_short_code(length: Optional[int] = None) -> str:
     Returns:
         Random short code string.
     """
-    length = length or settings.default_short_code_length
-    return "".join(random.choices(ALPHABET, k=length))
+    length = length or _DEFAULT_LENGTH
+    return urandom(length).translate(_BYTE_TO_CHAR).decode("ascii")
+
+
+def generate_short_codes(count: int, length: Optional[int] = None) -> list[str]:
+    """Generate several random short codes from a single random read.
+
+    Args:
+        count: Number of codes to generate.
+        length: Length of each code. Defaults to settings value.
+
+    Returns:
+        List of random short code strings.
+    """
+    length = length or _DEFAULT_LENGTH
+    chars = urandom(count * length).translate(_BYTE_TO_CHAR).decode("ascii")
+    return [chars[i:i + length] for i in range(0, count * length, length)]
 
 
 def validate_short_code(code: str) -> bool:
@@ -42,11 +66,10 @@ def validate_short_code(code: str) -> bool:
     """
     if not code:
         return False
-    if len(code) < settings.min_short_code_length or len(code) > settings.max_short_code_length:
+    if not MIN_SHORT_CODE_LENGTH <= len(code) <= MAX_SHORT_CODE_LENGTH:
         return False
-    if not re.match(r"^[a-zA-Z0-9]+$", code):
-        return False
-    return True
+    # Same as matching ^[a-zA-Z0-9]+$, without the regex engine
+    return code.isascii() and code.isalnum()
 
 
 def normalize_url(url: str) -> str:
@@ -84,6 +107,27 @@ def is_url_expired(expires_at: Optional[str]) -> bool:
         return False
 
 
+def seconds_until_expiry(expires_at: Optional[str]) -> Optional[float]:
+    """Get the number of seconds left until a URL expires.
+
+    Args:
+        expires_at: Expiration timestamp string.
+
+    Returns:
+        Seconds until expiration (negative if already expired),
+        or None if the URL never expires or the timestamp is invalid.
+    """
+    from datetime import datetime
+
+    if not expires_at:
+        return None
+    try:
+        expire_time = datetime.fromisoformat(expires_at.replace("Z", "+00:00"))
+        return (expire_time - datetime.now(expire_time.tzinfo)).total_seconds()
+    except (ValueError, AttributeError):
+        return None
+
+
 def create_short_url(base_url: str, short_code: str) -> str:
     """Create full short URL from base URL and short code.
 
@@ -1,63 +1,205 @@
 """Tests for URL Shortener Service."""
 
-import pytest
-from fastapi.testclient import TestClient
-from unittest.mock import MagicMock
-import sys
-from pathlib import Path
+import asyncio
+import re
+from contextlib import contextmanager
 
-# Add src directory to path
-sys.path.insert(0, str(Path(__file__).parent.parent))
+import pytest
+import pytest_asyncio
+from httpx import ASGITransport, AsyncClient
 
 from src.main import app
-from src.core.database import Database
-from src.utils.shortener import generate_short_code, validate_short_code, normalize_url
+from src.core.cache import URLCache, get_cache
+from src.core.database import Database, get_db
+from src.utils.shortener import (
+    generate_short_code,
+    generate_short_codes,
+    validate_short_code,
+    normalize_url,
+)
+
+_ALNUM = re.compile(r"[A-Za-z0-9]+")
+_TOO_SHORT = "ab"
+_TOO_LONG = "a" * 25
+
+
+@pytest_asyncio.fixture(scope="session")
+async def _session_db():
+    """Create the schema once for the whole test session."""
+    db = Database(":memory:")
+    conn = await db.connect()
+    # Tests never need durability
+    await conn.executescript(
+        "PRAGMA synchronous = OFF;"
+        "PRAGMA journal_mode = MEMORY;"
+        "PRAGMA temp_store = MEMORY;"
+        "PRAGMA locking_mode = EXCLUSIVE;"
+    )
+    await db.init_db()
+    yield db
+    await db.close()
 
 
 @pytest.fixture
-def test_db():
-    """Create a test database instance."""
-    db = Database(":memory:")
-    db.init_db()
-    yield db
-    db.close()
+async def test_db(_session_db):
+    """Provide the session database, emptied after each test.
+
+    Rows are deleted rather than rolled back to a SAVEPOINT: flush_clicks
+    opens its own BEGIN IMMEDIATE transaction, which SQLite refuses to
+    nest inside an open savepoint.
+    """
+    yield _session_db
+    await _session_db.flush_clicks()
+    await _session_db.execute("DELETE FROM urls")
 
 
 @pytest.fixture
-def client(test_db):
-    """Create a test client with mocked database."""
-    from src.core.database import get_db
-    
-    # Set the dependency override BEFORE creating TestClient
-    # so endpoint requests use the test database
-    app.dependency_overrides[get_db] = lambda: test_db
-    
-    # Manually manage the app lifecycle to avoid the default lifespan
-    # which would use the global database
-    from contextlib import asynccontextmanager
-    
-    # Store original lifespan
-    original_lifespan = app.router.lifespan_context
-    
-    # Override lifespan to not initialize database (we use test_db directly)
-    @asynccontextmanager
-    async def test_lifespan(app):
+def make_short_code(test_db):
+    """Return a factory that inserts a URL straight into the test database."""
+
+    async def _make(url="https://example.com", code=None):
+        row = await test_db.create_url(url, code or "auto01")
+        return row["short_code"]
+
+    return _make
+
+
+@pytest.fixture(scope="session", autouse=True)
+def _warm_up_models():
+    """Run one validation through each request/response model up front.
+
+    Keeps first-use validator costs out of whichever test happens to hit
+    an endpoint first.
+    """
+    from src.models import URLCreate
+    from src.schemas.url import URLCreateResponse, URLInfoResponse
+
+    URLCreate(original_url="https://example.com", custom_code="warmup")
+    record = {
+        "original_url": "https://example.com",
+        "short_code": "warmup",
+        "short_url": "http://testserver/warmup",
+        "created_at": "2024-01-01T00:00:00",
+    }
+    URLCreateResponse(**record)
+    URLInfoResponse(**record, clicks=0, is_active=True)
+
+
+@contextmanager
+def _override_db(database):
+    """Serve ``database`` to the endpoints for the duration of the block."""
+    app.dependency_overrides[get_db] = lambda: database
+    try:
         yield
-    
-    app.router.lifespan_context = test_lifespan
-    
-    with TestClient(app, raise_server_exceptions=False) as client:
+    finally:
+        app.dependency_overrides.pop(get_db, None)
+
+
+@pytest_asyncio.fixture(scope="session")
+async def _session_client():
+    """Create one in-loop ASGI client for the whole session.
+
+    Requests run on the session event loop, the same loop that owns the
+    test database. ASGITransport does not run the app lifespan, so the
+    global database is never opened; endpoints get the test database via
+    dependency_overrides.
+    """
+    transport = ASGITransport(app=app, raise_app_exceptions=False)
+    async with AsyncClient(transport=transport, base_url="http://test") as client:
         yield client
-    
-    # Restore original lifespan
-    app.router.lifespan_context = original_lifespan
-    app.dependency_overrides.clear()
+
+
+@pytest.fixture
+def client(_session_client, test_db):
+    """Provide the session client bound to the test database."""
+    with _override_db(test_db):
+        yield _session_client
+
+
+class FakeDatabase:
+    """Lightweight in-memory stand-in for Database.
+
+    Mirrors the Database methods used by the routes, storing records as
+    plain dicts in ``urls`` so tests can seed or inspect them directly.
+    """
+
+    def __init__(self):
+        self.urls = {}
+        self.clicks = {}
+
+    def _record(self, original_url, short_code, expires_at=None):
+        return {
+            "original_url": original_url,
+            "short_code": short_code,
+            "created_at": "2024-01-01T00:00:00",
+            "expires_at": expires_at,
+            "clicks": 0,
+            "is_active": 1,
+        }
+
+    async def create_url(self, original_url, short_code, expires_at=None):
+        self.urls[short_code] = self._record(original_url, short_code, expires_at)
+        return self.urls[short_code]
+
+    async def try_create_url(self, original_url, short_code, expires_at=None):
+        if short_code in self.urls:
+            return None
+        return await self.create_url(original_url, short_code, expires_at)
+
+    async def get_url_by_code(self, short_code):
+        url = self.urls.get(short_code)
+        return url if url and url["is_active"] else None
+
+    async def get_redirect_target(self, short_code):
+        url = await self.get_url_by_code(short_code)
+        return (url["original_url"], url["expires_at"]) if url else None
+
+    async def url_exists(self, short_code):
+        return short_code in self.urls
+
+    async def update_url(self, short_code, new_original_url):
+        url = await self.get_url_by_code(short_code)
+        if url:
+            url["original_url"] = new_original_url
+        return url
+
+    async def delete_url(self, short_code):
+        url = await self.get_url_by_code(short_code)
+        if not url:
+            return False
+        url["is_active"] = 0
+        return True
+
+    def increment_clicks(self, short_code):
+        self.clicks[short_code] = self.clicks.get(short_code, 0) + 1
+
+    def pending_clicks(self, short_code):
+        return self.clicks.get(short_code, 0)
+
+    async def flush_clicks(self):
+        flushed = len(self.clicks)
+        for short_code, count in self.clicks.items():
+            if short_code in self.urls:
+                self.urls[short_code]["clicks"] += count
+        self.clicks.clear()
+        return flushed
+
+    async def get_all_urls(self, base_url):
+        return [
+            {
+                **url,
+                "short_url": f"{base_url}/{url['short_code']}",
+                "clicks": url["clicks"] + self.pending_clicks(url["short_code"]),
+            }
+            for url in self.urls.values()
+            if url["is_active"]
+        ]
 
 
 @pytest.fixture
 def mock_db():
-    """Create a mock database."""
-    return MagicMock(spec=Database)
+    """Create a fake database."""
+    return FakeDatabase()
 
 
 class TestShortenerLogic:
@@ -71,28 +213,30 @@ class TestShortenerLogic:
 
     def test_generate_short_code_alphanumeric(self):
         """Test that generated codes are alphanumeric."""
-        for _ in range(100):
-            code = generate_short_code()
-            assert code.isalnum()
-
-    def test_validate_short_code_valid(self):
-        """Test validation of valid short codes."""
-        valid_codes = ["abc", "abc123", "Abc123", "a1b2c3", "shortcode"]
-        for code in valid_codes:
-            assert validate_short_code(code) is True
-
-    def test_validate_short_code_invalid(self):
-        """Test validation of invalid short codes."""
-        invalid_codes = [
-            "",
-            "ab",  # too short
-            "a" * 25,  # too long
-            "abc@123",  # special chars
-            "abc def",  # spaces
-            "abc-123",  # hyphen
-        ]
-        for code in invalid_codes:
-            assert validate_short_code(code) is False
+        codes = generate_short_codes(100)
+        assert len(codes) == 100
+        assert all(len(code) == 6 and _ALNUM.fullmatch(code) for code in codes)
+        assert _ALNUM.fullmatch(generate_short_code())
+
+    @pytest.mark.parametrize(
+        "code,expected",
+        [
+            ("abc", True),
+            ("abc123", True),
+            ("Abc123", True),
+            ("a1b2c3", True),
+            ("shortcode", True),
+            ("", False),
+            (_TOO_SHORT, False),
+            (_TOO_LONG, False),
+            ("abc@123", False),  # special chars
+            ("abc def", False),  # spaces
+            ("abc-123", False),  # hyphen
+        ],
+    )
+    def test_validate_short_code(self, code, expected):
+        """Test validation of short codes."""
+        assert validate_short_code(code) is expected
 
     def test_normalize_url(self):
         """Test URL normalization."""
@@ -107,20 +251,58 @@ class TestShortenerLogic:
 class TestHealthEndpoint:
     """Tests for health check endpoint."""
 
-    def test_health_check(self, client):
+    async def test_health_check(self, client):
         """Test health check returns healthy status."""
-        response = client.get("/health")
+        response = await client.get("/health")
         assert response.status_code == 200
         assert response.json() == {"status": "healthy"}
 
 
+class TestCORS:
+    """Tests for CORS handling on the /api sub-application."""
+
+    async def test_api_preflight_allowed_origin(self, client):
+        """Test that /api answers preflight requests for configured origins."""
+        response = await client.options(
+            "/api/shorten",
+            headers={
+                "Origin": "http://localhost:3000",
+                "Access-Control-Request-Method": "POST",
+            },
+        )
+        assert response.status_code == 200
+        assert response.headers["access-control-allow-origin"] == "http://localhost:3000"
+
+    async def test_redirect_has_no_cors_headers(self, client):
+        """Test that the root redirect path is served without CORS middleware."""
+        create_response = await client.post(
+            "/api/shorten",
+            json={"original_url": "https://example.com"}
+        )
+        short_code = create_response.json()["short_code"]
+
+        response = await client.get(
+            f"/{short_code}",
+            headers={"Origin": "http://localhost:3000"},
+        )
+        assert response.status_code == 302
+        assert "access-control-allow-origin" not in response.headers
+
+
 class TestCreateShortURL:
     """Tests for POST /shorten endpoint."""
 
-    def test_create_short_url_success(self, client):
+    @pytest.fixture(autouse=True)
+    def patch_rng(self, monkeypatch):
+        """Make generated codes deterministic; these tests never assert randomness."""
+        from src.utils import shortener
+
+        monkeypatch.setattr(shortener, "urandom", lambda n: bytes(range(n)))
+
+    async def test_create_short_url_success(self, client):
         """Test creating a short URL successfully."""
-        response = client.post(
-            "/shorten",
+        response = await client.post(
+            "/api/shorten",
             json={"original_url": "https://example.com"}
         )
         assert response.status_code == 201
@@ -129,12 +311,12 @@ class TestCreateShortURL:
         assert "short_url" in data
         # Note: HttpUrl in Pydantic adds trailing slash
         assert data["original_url"].rstrip("/") == "https://example.com"
-        assert len(data["short_code"]) == 6
+        assert data["short_code"] == "abcdef"
 
-    def test_create_short_url_with_custom_code(self, client):
+    async def test_create_short_url_with_custom_code(self, client):
         """Test creating a short URL with custom code."""
-        response = client.post(
-            "/shorten",
+        response = await client.post(
+            "/api/shorten",
             json={
                 "original_url": "https://example.com",
                 "custom_code": "custom"
@@ -143,46 +325,33 @@ class TestCreateShortURL:
         assert response.status_code == 201
         data = response.json()
         assert data["short_code"] == "custom"
-        assert "custom" in data["short_url"]
-
-    def test_create_short_url_custom_code_too_short(self, client):
-        """Test creating with too short custom code."""
-        response = client.post(
-            "/shorten",
-            json={
-                "original_url": "https://example.com",
-                "custom_code": "ab"
-            }
-        )
-        assert response.status_code == 422  # Pydantic validation error
-
-    def test_create_short_url_custom_code_too_long(self, client):
-        """Test creating with too long custom code."""
-        response = client.post(
-            "/shorten",
+        # Short URLs point at the root redirect, not the /api mount
+        assert data["short_url"] == "http://test/custom"
+
+    @pytest.mark.parametrize(
+        "code",
+        [
+            _TOO_SHORT,
+            _TOO_LONG,
+            "invalid@code",  # invalid characters
+        ],
+    )
+    async def test_create_short_url_custom_code_validation(self, client, code):
+        """Test that malformed custom codes are rejected by model validation."""
+        response = await client.post(
+            "/api/shorten",
             json={
                 "original_url": "https://example.com",
-                "custom_code": "a" * 25
+                "custom_code": code
             }
         )
         assert response.status_code == 422  # Pydantic validation error
 
-    def test_create_short_url_custom_code_invalid_chars(self, client):
-        """Test creating with invalid custom code characters."""
-        response = client.post(
-            "/shorten",
-            json={
-                "original_url": "https://example.com",
-                "custom_code": "invalid@code"
-            }
-        )
-        assert response.status_code == 400
-
-    def test_create_short_url_duplicate_custom_code(self, client):
+    async def test_create_short_url_duplicate_custom_code(self, client):
         """Test creating with duplicate custom code."""
         # Create first URL with custom code
-        response = client.post(
-            "/shorten",
+        response = await client.post(
+            "/api/shorten",
             json={
                 "original_url": "https://example.com",
                 "custom_code": "duplicate"
@@ -191,8 +360,8 @@ class TestCreateShortURL:
         assert response.status_code == 201
 
         # Try to create another with same code
-        response = client.post(
-            "/shorten",
+        response = await client.post(
+            "/api/shorten",
             json={
                 "original_url": "https://example2.com",
                 "custom_code": "duplicate"
@@ -201,10 +370,27 @@ class TestCreateShortURL:
         assert response.status_code == 409
         assert "already exists" in response.json()["detail"]
 
-    def test_create_short_url_invalid_url(self, client):
+    async def test_create_short_url_code_space_exhausted(self, _session_client, mock_db, monkeypatch):
+        """Test that repeated code collisions give up with a 500."""
+        from src.api.routes import urls
+
+        # Every generated code collides with an existing record
+        monkeypatch.setattr(urls, "generate_short_code", lambda: "taken1")
+        mock_db.urls["taken1"] = mock_db._record("https://example.com", "taken1")
+
+        with _override_db(mock_db):
+            response = await _session_client.post(
+                "/api/shorten",
+                json={"original_url": "https://example2.com"}
+            )
+
+        assert response.status_code == 500
+        assert response.json()["detail"] == "Failed to generate unique short code"
+
+    async def test_create_short_url_invalid_url(self, client):
         """Test creating with invalid URL format."""
-        response = client.post(
-            "/shorten",
+        response = await client.post(
+            "/api/shorten",
             json={"original_url": "not-a-valid-url"}
         )
         assert response.status_code == 422  # Validation error
@@ -213,104 +399,107 @@ class TestCreateShortURL:
 class TestRedirectEndpoint:
     """Tests for GET /{short_code} endpoint."""
 
-    def test_redirect_success(self, client):
+    async def test_redirect_success(self, client, make_short_code):
         """Test successful redirect."""
-        # Create a short URL first
-        create_response = client.post(
-            "/shorten",
-            json={"original_url": "https://example.com"}
-        )
-        short_code = create_response.json()["short_code"]
+        short_code = await make_short_code()
 
         # Redirect
-        response = client.get(f"/{short_code}", follow_redirects=False)
+        response = await client.get(f"/{short_code}")
         assert response.status_code == 302
         # Note: HttpUrl in Pydantic adds trailing slash
         assert response.headers["location"].rstrip("/") == "https://example.com"
 
-    def test_redirect_not_found(self, client):
+    async def test_redirect_not_found(self, client):
         """Test redirect for non-existent short code."""
-        response = client.get("/nonexistent", follow_redirects=False)
+        response = await client.get("/nonexistent")
         assert response.status_code == 404
 
-    def test_redirect_invalid_code(self, client):
-        """Test redirect with invalid short code format."""
-        response = client.get("/ab", follow_redirects=False)  # Too short
-        assert response.status_code == 404
-
-    def test_redirect_click_count_increments(self, client):
+    async def test_redirect_click_count_increments(self, client, make_short_code):
         """Test that redirect increments click count."""
-        # Create a short URL
-        create_response = client.post(
-            "/shorten",
-            json={"original_url": "https://example.com"}
-        )
-        short_code = create_response.json()["short_code"]
+        short_code = await make_short_code()
 
         # Get info before redirect
-        info_response = client.get(f"/{short_code}/info")
+        info_response = await client.get(f"/api/{short_code}/info")
         clicks_before = info_response.json()["clicks"]
 
-        # Redirect multiple times
-        for _ in range(3):
-            client.get(f"/{short_code}", follow_redirects=False)
+        # Redirect multiple times concurrently
+        await asyncio.gather(
+            *(client.get(f"/{short_code}") for _ in range(3))
+        )
 
         # Get info after redirect
-        info_response = client.get(f"/{short_code}/info")
+        info_response = await client.get(f"/api/{short_code}/info")
         clicks_after = info_response.json()["clicks"]
 
         assert clicks_after == clicks_before + 3
 
 
+class TestRedirectCaching:
+    """Tests for cacheable redirect responses."""
+
+    def test_default_redirect_is_uncached_302(self):
+        """Test that redirects are plain 302s unless caching is configured."""
+        from src.api.routes.redirect import build_redirect_response
+
+        response = build_redirect_response("https://example.com", None)
+        assert response.status_code == 302
+        assert "cache-control" not in response.headers
+
+    def test_cacheable_redirect_respects_expiration(self, monkeypatch):
+        """Test that max-age is capped by expires_at when caching is enabled."""
+        from datetime import datetime, timedelta
+        from src.api.routes import redirect
+
+        monkeypatch.setattr(redirect, "_REDIRECT_CACHE_MAX_AGE", 3600)
+
+        response = redirect.build_redirect_response("https://example.com", None)
+        assert response.status_code == 301
+        assert response.headers["cache-control"] == "public, max-age=3600"
+
+        soon = (datetime.now() + timedelta(seconds=120)).isoformat()
+        response = redirect.build_redirect_response("https://example.com", soon)
+        max_age = int(response.headers["cache-control"].rsplit("=", 1)[1])
+        assert 0 < max_age <= 120
+
+        past = (datetime.now() - timedelta(seconds=1)).isoformat()
+        response = redirect.build_redirect_response("https://example.com", past)
+        assert response.status_code == 302
+
+
 class TestDeleteEndpoint:
     """Tests for DELETE /{short_code} endpoint."""
 
-    def test_delete_success(self, client):
+    async def test_delete_success(self, client, make_short_code):
         """Test deleting a short URL successfully."""
-        # Create a short URL first
-        create_response = client.post(
-            "/shorten",
-            json={"original_url": "https://example.com"}
-        )
-        short_code = create_response.json()["short_code"]
+        short_code = await make_short_code()
 
         # Delete it
-        response = client.delete(f"/{short_code}")
+        response = await client.delete(f"/api/{short_code}")
         assert response.status_code == 200
         data = response.json()
         assert data["message"] == "URL deleted successfully"
         assert data["short_code"] == short_code
 
         # Verify it's deleted (can't redirect)
-        response = client.get(f"/{short_code}", follow_redirects=False)
+        response = await client.get(f"/{short_code}")
         assert response.status_code == 404
 
-    def test_delete_not_found(self, client):
+    async def test_delete_not_found(self, client):
         """Test deleting non-existent short URL."""
-        response = client.delete("/nonexistent")
-        assert response.status_code == 404
-
-    def test_delete_invalid_code(self, client):
-        """Test deleting with invalid short code format."""
-        response = client.delete("/ab")  # Too short
+        response = await client.delete("/api/nonexistent")
         assert response.status_code == 404
 
 
 class TestUpdateEndpoint:
     """Tests for PUT /{short_code} endpoint."""
 
-    def test_update_success(self, client):
+    async def test_update_success(self, client, make_short_code):
         """Test updating a short URL successfully."""
-        # Create a short URL first
-        create_response = client.post(
-            "/shorten",
-            json={"original_url": "https://example.com"}
-        )
-        short_code = create_response.json()["short_code"]
+        short_code = await make_short_code()
 
         # Update it
-        response = client.put(
-            f"/{short_code}",
+        response = await client.put(
+            f"/api/{short_code}",
             json={"original_url": "https://updated.com"}
         )
         assert response.status_code == 200
@@ -319,44 +508,55 @@ class TestUpdateEndpoint:
         assert data["original_url"].rstrip("/") == "https://updated.com"
 
         # Verify redirect goes to updated URL
-        redirect_response = client.get(
-            f"/{short_code}", follow_redirects=False
-        )
+        redirect_response = await client.get(f"/{short_code}")
         assert redirect_response.headers["location"].rstrip("/") == "https://updated.com"
 
-    def test_update_not_found(self, client):
+    async def test_update_not_found(self, client):
         """Test updating non-existent short URL."""
-        response = client.put(
-            "/nonexistent",
+        response = await client.put(
+            "/api/nonexistent",
             json={"original_url": "https://updated.com"}
         )
         assert response.status_code == 404
 
-    def test_update_invalid_code(self, client):
-        """Test updating with invalid short code format."""
-        response = client.put(
-            "/ab",
+    async def test_update_deleted_url(self, client, test_db, make_short_code):
+        """Test that a deleted short URL can no longer be updated."""
+        short_code = await make_short_code()
+        await test_db.delete_url(short_code)
+
+        response = await client.put(
+            f"/api/{short_code}",
             json={"original_url": "https://updated.com"}
         )
         assert response.status_code == 404
 
 
+class TestInvalidShortCode:
+    """Tests for malformed short codes across redirect, delete and update."""
+
+    @pytest.mark.parametrize(
+        "method,path,body",
+        [
+            ("GET", f"/{_TOO_SHORT}", None),
+            ("DELETE", f"/api/{_TOO_SHORT}", None),
+            ("PUT", f"/api/{_TOO_SHORT}", {"original_url": "https://updated.com"}),
+        ],
+    )
+    async def test_invalid_code(self, client, method, path, body):
+        """Test that a too-short code is reported as not found."""
+        response = await client.request(method, path, json=body)
+        assert response.status_code == 404
+
+
 class TestURLInfoEndpoint:
     """Tests for GET /{short_code}/info endpoint."""
 
-    def test_get_url_info_success(self, client):
+    async def test_get_url_info_success(self, client, make_short_code):
         """Test getting URL info successfully."""
-        # Create a short URL first
-        create_response = client.post(
-            "/shorten",
-            json={
-                "original_url": "https://example.com",
-                "custom_code": "infotest"
-            }
-        )
+        await make_short_code(code="infotest")
 
         # Get info
-        response = client.get("/infotest/info")
+        response = await client.get("/api/infotest/info")
         assert response.status_code == 200
         data = response.json()
         # Note: HttpUrl in Pydantic adds trailing slash
@@ -366,110 +566,368 @@ class TestURLInfoEndpoint:
         assert "created_at" in data
         assert "clicks" in data
 
-    def test_get_url_info_not_found(self, client):
+    async def test_get_url_info_not_found(self, client):
         """Test getting info for non-existent URL."""
-        response = client.get("/nonexistent/info")
+        response = await client.get("/api/nonexistent/info")
         assert response.status_code == 404
 
 
 class TestListURLsEndpoint:
     """Tests for GET / endpoint."""
 
-    def test_list_urls_with_data(self, test_db):
+    async def test_list_urls_with_data(self, client, test_db):
         """Test listing URLs with existing data."""
-        from src.core.database import get_db
         # Create URLs
-        test_db.create_url("https://example1.com", "list1")
-        test_db.create_url("https://example2.com", "list2")
-        test_db.create_url("https://example3.com", "list3")
-
-        app.dependency_overrides[get_db] = lambda: test_db
-        
-        # Store original lifespan
-        from contextlib import asynccontextmanager
-        original_lifespan = app.router.lifespan_context
-        
-        @asynccontextmanager
-        async def test_lifespan(app):
-            yield
-        
-        app.router.lifespan_context = test_lifespan
-        
-        with TestClient(app) as list_client:
-            response = list_client.get("/")
-            assert response.status_code == 200
-            data = response.json()
-            assert len(data) == 3
-        
-        app.router.lifespan_context = original_lifespan
-        app.dependency_overrides.clear()
+        await test_db.create_urls_bulk([
+            ("https://example1.com", "list1"),
+            ("https://example2.com", "list2"),
+            ("https://example3.com", "list3"),
+        ])
+
+        response = await client.get("/api/")
+        assert response.status_code == 200
+        data = response.json()
+        assert len(data) == 3
+
+    async def test_list_urls_gzip(self, client, test_db):
+        """Test that large list responses are gzip-compressed."""
+        await test_db.create_urls_bulk(
+            [(f"https://example{i}.com", f"gzip{i:02d}") for i in range(20)]
+        )
+
+        response = await client.get("/api/", headers={"Accept-Encoding": "gzip"})
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "gzip"
+        assert len(response.json()) == 20
+
+        health = await client.get("/health", headers={"Accept-Encoding": "gzip"})
+        assert "content-encoding" not in health.headers
 
 
 class TestDatabaseIntegration:
     """Integration tests for database operations."""
 
-    def test_url_creation_and_retrieval(self, test_db):
+    async def test_url_creation_and_retrieval(self, test_db):
         """Test URL creation and retrieval from database."""
-        url = test_db.create_url("https://example.com", "testcode")
+        url = await test_db.create_url("https://example.com", "testcode")
         assert url["original_url"] == "https://example.com"
         assert url["short_code"] == "testcode"
 
         # Retrieve
-        retrieved = test_db.get_url_by_code("testcode")
+        retrieved = await test_db.get_url_by_code("testcode")
         assert retrieved is not None
         assert retrieved["original_url"] == "https://example.com"
 
-    def test_url_exists(self, test_db):
+    async def test_url_exists(self, test_db):
         """Test checking if URL exists."""
-        assert test_db.url_exists("nonexistent") is False
+        assert await test_db.url_exists("nonexistent") is False
+
+        await test_db.create_url("https://example.com", "testcode")
+        assert await test_db.url_exists("testcode") is True
+
+    async def test_create_urls_bulk_is_atomic(self, test_db):
+        """Test that a failing bulk insert leaves no rows behind."""
+        import sqlite3
+
+        with pytest.raises(sqlite3.IntegrityError):
+            await test_db.create_urls_bulk([
+                ("https://example1.com", "bulk1"),
+                ("https://example2.com", "bulk1"),
+            ])
+        assert await test_db.get_url_by_code("bulk1") is None
+
+    async def test_create_urls_bulk_alongside_flush(self, test_db):
+        """Test that a bulk insert and a click flush do not share a transaction."""
+        await test_db.create_url("https://example.com", "flushme")
+        test_db.increment_clicks("flushme")
+
+        flushed, _ = await asyncio.gather(
+            test_db.flush_clicks(),
+            test_db.create_urls_bulk([("https://example1.com", "conc1")]),
+        )
+        assert flushed == 1
+        assert (await test_db.get_url_by_code("flushme"))["clicks"] == 1
+        assert await test_db.url_exists("conc1") is True
+
+    async def test_try_create_url_collision(self, test_db):
+        """Test that try_create_url returns None for a taken short code."""
+        created = await test_db.try_create_url("https://example.com", "taken")
+        assert created is not None
+        assert created["short_code"] == "taken"
+
+        collided = await test_db.try_create_url("https://other.com", "taken")
+        assert collided is None
+
+        # Original record is left untouched
+        url = await test_db.get_url_by_code("taken")
+        assert url["original_url"] == "https://example.com"
 
-        test_db.create_url("https://example.com", "testcode")
-        assert test_db.url_exists("testcode") is True
+    async def test_get_redirect_target(self, test_db):
+        """Test fetching only the redirect columns for a short code."""
+        await test_db.create_url("https://example.com", "redir1", "2030-01-01T00:00:00")
 
-    def test_url_update(self, test_db):
+        original_url, expires_at = await test_db.get_redirect_target("redir1")
+        assert original_url == "https://example.com"
+        assert expires_at == "2030-01-01T00:00:00"
+
+        await test_db.delete_url("redir1")
+        assert await test_db.get_redirect_target("redir1") is None
+
+    async def test_url_update(self, test_db):
         """Test updating a URL."""
-        test_db.create_url("https://old.com", "updatecode")
+        await test_db.create_url("https://old.com", "updatecode")
 
-        updated = test_db.update_url("updatecode", "https://new.com")
+        updated = await test_db.update_url("updatecode", "https://new.com")
         assert updated["original_url"] == "https://new.com"
 
-    def test_url_delete(self, test_db):
+    async def test_url_delete(self, test_db):
         """Test deleting a URL (soft delete)."""
-        test_db.create_url("https://example.com", "deletecode")
+        await test_db.create_url("https://example.com", "deletecode")
 
         # Should exist before delete
-        assert test_db.get_url_by_code("deletecode") is not None
+        assert await test_db.get_url_by_code("deletecode") is not None
 
         # Delete
-        deleted = test_db.delete_url("deletecode")
+        deleted = await test_db.delete_url("deletecode")
         assert deleted is True
 
         # Should not be found (soft delete)
-        assert test_db.get_url_by_code("deletecode") is None
+        assert await test_db.get_url_by_code("deletecode") is None
 
-    def test_increment_clicks(self, test_db):
+    async def test_increment_clicks(self, test_db):
         """Test incrementing click count."""
-        test_db.create_url("https://example.com", "clickscode")
+        await test_db.create_url("https://example.com", "clickscode")
 
         # Get initial clicks
-        url = test_db.get_url_by_code("clickscode")
+        url = await test_db.get_url_by_code("clickscode")
         initial_clicks = url["clicks"]
 
-        # Increment
+        # Increment (buffered until flushed)
         test_db.increment_clicks("clickscode")
+        assert test_db.pending_clicks("clickscode") == 1
 
-        # Verify
-        url = test_db.get_url_by_code("clickscode")
+        # Flush and verify
+        assert await test_db.flush_clicks() == 1
+        assert test_db.pending_clicks("clickscode") == 0
+        url = await test_db.get_url_by_code("clickscode")
         assert url["clicks"] == initial_clicks + 1
 
-    def test_get_all_urls(self, test_db):
+    async def test_flush_clicks_batches_increments(self, test_db):
+        """Test that buffered clicks for several URLs are flushed together."""
+        await test_db.create_url("https://example1.com", "batch1")
+        await test_db.create_url("https://example2.com", "batch2")
+
+        for _ in range(3):
+            test_db.increment_clicks("batch1")
+        test_db.increment_clicks("batch2")
+
+        assert await test_db.flush_clicks() == 2
+        assert await test_db.flush_clicks() == 0
+
+        assert (await test_db.get_url_by_code("batch1"))["clicks"] == 3
+        assert (await test_db.get_url_by_code("batch2"))["clicks"] == 1
+
+    async def test_cancelled_flush_keeps_clicks(self, test_db):
+        """Test that cancelling a flush rolls it back and keeps its clicks."""
+        await test_db.create_url("https://example.com", "cancel1")
+        for _ in range(3):
+            test_db.increment_clicks("cancel1")
+
+        task = asyncio.create_task(test_db.flush_clicks())
+        await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        conn = await test_db.connect()
+        assert not conn.in_transaction
+        assert test_db.pending_clicks("cancel1") == 3
+        assert await test_db.flush_clicks() == 1
+        assert (await test_db.get_url_by_code("cancel1"))["clicks"] == 3
+
+    async def test_flush_cancelled_during_commit_is_not_replayed(
+        self, test_db, monkeypatch
+    ):
+        """Test that a COMMIT interrupted by cancellation is not re-buffered."""
+        await test_db.create_url("https://example.com", "commit1")
+        for _ in range(3):
+            test_db.increment_clicks("commit1")
+
+        conn = await test_db.connect()
+        execute = conn.execute
+
+        def cancel_on_commit(sql, *args):
+            # The COMMIT is queued before the cancellation is delivered
+            if sql == "COMMIT":
+                task.cancel()
+            return execute(sql, *args)
+
+        monkeypatch.setattr(conn, "execute", cancel_on_commit)
+        task = asyncio.create_task(test_db.flush_clicks())
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        monkeypatch.undo()
+
+        assert not conn.in_transaction
+        assert test_db.pending_clicks("commit1") == 0
+        assert await test_db.flush_clicks() == 0
+        assert (await test_db.get_url_by_code("commit1"))["clicks"] == 3
+
+    async def test_flush_loop_stops_on_event(self, test_db):
+        """Test that the periodic flush loop exits once its event is set."""
+        from src.core.database import flush_clicks_periodically
+
+        stop = asyncio.Event()
+        task = asyncio.create_task(flush_clicks_periodically(test_db, 60, stop))
+        stop.set()
+        await asyncio.wait_for(task, timeout=1)
+
+    async def test_get_all_urls(self, test_db):
         """Test getting all URLs."""
-        test_db.create_url("https://example1.com", "code1")
-        test_db.create_url("https://example2.com", "code2")
-        test_db.create_url("https://example3.com", "code3")
+        await test_db.create_urls_bulk([
+            ("https://example1.com", "code1"),
+            ("https://example2.com", "code2"),
+            ("https://example3.com", "code3"),
+        ])
 
-        urls = test_db.get_all_urls()
+        urls = await test_db.get_all_urls("http://testserver")
         assert len(urls) == 3
+        assert {url["short_url"] for url in urls} == {
+            "http://testserver/code1",
+            "http://testserver/code2",
+            "http://testserver/code3",
+        }
+
+    async def test_get_all_urls_includes_pending_clicks(self, test_db):
+        """Test that listed click counts include clicks not yet flushed."""
+        await test_db.create_url("https://example.com", "listclk")
+        for _ in range(3):
+            test_db.increment_clicks("listclk")
+
+        (url,) = await test_db.get_all_urls("http://testserver")
+        assert url["clicks"] == 3
+
+
+class _FakeRedis:
+    """Minimal async stand-in for the redis client used by URLCache."""
+
+    def __init__(self):
+        self.store = {}
+        self.ttls = {}
+
+    async def get(self, key):
+        return self.store.get(key)
+
+    async def setex(self, key, ttl, value):
+        self.store[key] = value
+        self.ttls[key] = ttl
+
+    async def delete(self, key):
+        self.store.pop(key, None)
+        self.ttls.pop(key, None)
+
+
+@pytest.fixture
+def fake_cache():
+    """Serve a URLCache backed by _FakeRedis to the endpoints."""
+    cache = URLCache(default_ttl=60)
+    cache._client = _FakeRedis()
+    app.dependency_overrides[get_cache] = lambda: cache
+    yield cache
+    app.dependency_overrides.pop(get_cache, None)
+
+
+class TestURLCache:
+    """Tests for the Redis-backed URL cache."""
+
+    async def test_disabled_cache_is_noop(self):
+        """Test that a cache without a Redis URL never stores anything."""
+        cache = URLCache()
+        await cache.connect()
+        assert cache.enabled is False
+        await cache.set_redirect_target("abc123", "https://example.com")
+        assert await cache.get_redirect_target("abc123") is None
+
+    async def test_set_get_invalidate(self):
+        """Test caching and invalidating a redirect target."""
+        cache = URLCache(default_ttl=60)
+        cache._client = _FakeRedis()
+
+        await cache.set_redirect_target("abc123", "https://example.com")
+        assert await cache.get_redirect_target("abc123") == ("https://example.com", None)
+        assert cache._client.ttls["u:abc123"] == 60
+
+        await cache.invalidate("abc123")
+        assert await cache.get_redirect_target("abc123") is None
+
+    async def test_ttl_respects_expiration(self):
+        """Test that the TTL is capped by expires_at and expired URLs are skipped."""
+        from datetime import datetime, timedelta
+
+        cache = URLCache(default_ttl=3600)
+        cache._client = _FakeRedis()
+
+        soon = (datetime.now() + timedelta(seconds=120)).isoformat()
+        await cache.set_redirect_target("soon01", "https://example.com", soon)
+        assert 0 < cache._client.ttls["u:soon01"] <= 120
+        assert await cache.get_redirect_target("soon01") == ("https://example.com", soon)
+
+        past = (datetime.now() - timedelta(seconds=1)).isoformat()
+        await cache.set_redirect_target("past01", "https://example.com", past)
+        assert await cache.get_redirect_target("past01") is None
+
+
+class TestRedirectCacheWiring:
+    """Tests for how the endpoints use the URL cache."""
+
+    async def test_cache_hit_skips_database(self, client, test_db, fake_cache):
+        """Test that a cached target redirects and counts a click without a row."""
+        await fake_cache.set_redirect_target("cached1", "https://cached.example.com")
+
+        response = await client.get("/cached1")
+        assert response.status_code == 302
+        assert response.headers["location"] == "https://cached.example.com"
+        assert test_db.pending_clicks("cached1") == 1
+
+    async def test_cache_miss_populates_cache(self, client, fake_cache, make_short_code):
+        """Test that a database lookup stores the target in the cache."""
+        short_code = await make_short_code()
+
+        response = await client.get(f"/{short_code}")
+        assert response.status_code == 302
+        assert await fake_cache.get_redirect_target(short_code) == (
+            "https://example.com",
+            None,
+        )
+
+    async def test_update_invalidates_cache(self, client, fake_cache, make_short_code):
+        """Test that updating a URL drops its cached redirect target."""
+        short_code = await make_short_code()
+        await client.get(f"/{short_code}")
+        assert f"u:{short_code}" in fake_cache._client.store
+
+        response = await client.put(
+            f"/api/{short_code}",
+            json={"original_url": "https://updated.com"}
+        )
+        assert response.status_code == 200
+        assert f"u:{short_code}" not in fake_cache._client.store
+
+        response = await client.get(f"/{short_code}")
+        assert response.headers["location"].rstrip("/") == "https://updated.com"
+
+    async def test_delete_invalidates_cache(self, client, fake_cache, make_short_code):
+        """Test that deleting a URL drops its cached redirect target."""
+        short_code = await make_short_code()
+        await client.get(f"/{short_code}")
+        assert f"u:{short_code}" in fake_cache._client.store
+
+        response = await client.delete(f"/api/{short_code}")
+        assert response.status_code == 200
+        assert f"u:{short_code}" not in fake_cache._client.store
+
+        response = await client.get(f"/{short_code}")
+        assert response.status_code == 404
 
 
 if __name__ == "__main__":